@@ -1,6 +1,6 @@
 from src.data_loader import get_yfinance_data
 from src.strategies import compute_dca_nav, compute_momentum_dca_nav
-from src.ap_decomposition import compute_ap_decomposition, analyze_ap_components
+from src.ap_decomposition import compute_ap_decomposition, analyze_ap_components, json_default
 from src.backtest import calculate_performance_metrics
 from src.visualize import create_ap_focused_analysis
 
@@ -56,7 +56,7 @@ def main():
             ticker=RESEARCH_CONFIG['target_asset'],
             start=RESEARCH_CONFIG['study_period']['start'],
             end=today,
-            save_path='results/raw_data.csv'
+            save_path='results/raw_data.parquet'
         )
         
         print(f"✅ 研究樣本: {len(df_raw)} 個交易日")
@@ -188,7 +188,7 @@ def save_research_results(passive_metrics, active_metrics, ap_results, ap_analys
     }
     
     with open('results/complete_research_results.json', 'w', encoding='utf-8') as f:
-        json.dump(research_output, f, indent=2, ensure_ascii=False, default=str)
+        json.dump(research_output, f, indent=2, ensure_ascii=False, default=json_default)
     
  
 if __name__ == "__main__":
@@ -1,6 +1,44 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+def _weight_return_moments(w: np.ndarray, r: np.ndarray) -> Dict[str, float]:
+    """
+    以同一組累加和一次求出權重與報酬的平均、標準差、共變異數與相關係數，
+    取代 np.cov、np.corrcoef 與多次 np.mean / np.std 的重複掃描。
+
+    以首筆觀測值平移資料後再累加，避免平方和相減造成的數值抵銷。
+    標準差為母體標準差 (ddof=0)，共變異數為樣本共變異數 (ddof=1)。
+    """
+    n = w.size
+    dw = w - w[0]
+    dr = r - r[0]
+
+    sum_w = dw.sum()
+    sum_r = dr.sum()
+    sum_ww = np.dot(dw, dw)
+    sum_rr = np.dot(dr, dr)
+    sum_wr = np.dot(dw, dr)
+
+    mean_dw = sum_w / n
+    mean_dr = sum_r / n
+    ss_w = max(sum_ww - sum_w * mean_dw, 0.0)
+    ss_r = max(sum_rr - sum_r * mean_dr, 0.0)
+    ss_wr = sum_wr - sum_w * mean_dr
+
+    std_product = np.sqrt(ss_w * ss_r)
+
+    return {
+        'mean_w': w[0] + mean_dw,
+        'mean_r': r[0] + mean_dr,
+        'std_w': np.sqrt(ss_w / n),
+        'std_r': np.sqrt(ss_r / n),
+        'cov': ss_wr / (n - 1),
+        'corr': ss_wr / std_product if std_product > 0 else np.nan
+    }
+
 
 def compute_ap_decomposition(df: pd.DataFrame) -> Dict[str, float]:
     """
@@ -41,37 +79,46 @@ def compute_ap_decomposition(df: pd.DataFrame) -> Dict[str, float]:
     if 'Weight' not in df.columns or 'Return' not in df.columns:
         raise ValueError("AP 分解需要包含 Weight 與 Return 欄位")
 
-    df_clean = df[['Weight', 'Return']].dropna()
+    # 直接取出 ndarray 並排除缺值，避免建立子 DataFrame
+    w = df['Weight'].to_numpy(dtype=float)
+    r = df['Return'].to_numpy(dtype=float)
+    valid = ~(np.isnan(w) | np.isnan(r))
 
-    if len(df_clean) < 10:
+    return _ap_from_arrays(w[valid], r[valid])
+
+
+def _ap_from_arrays(w: np.ndarray, r: np.ndarray) -> Dict[str, float]:
+    """
+    以已排除缺值之權重與報酬陣列計算 AP 分解，略過欄位檢查。
+    供 compute_ap_decomposition 及其他已持有 ndarray 的呼叫端直接使用。
+    """
+    if w.size < 10:
         return {
             'Active (δp)': 0.0,
             'Passive (νp)': 0.0,
             'Active Ratio (θp)': 0.0,
             'Data Quality': 'Insufficient data for reliable decomposition',
-            'Sample Size': len(df_clean)
+            'Sample Size': w.size
         }
 
-    w = df_clean['Weight'].values
-    r = df_clean['Return'].values
-
     try:
         # === 核心 AP 分解計算 ===
 
+        moments = _weight_return_moments(w, r)
+
         # 1. 主動成分：權重與報酬的共變異數
-        cov_matrix = np.cov(w, r, ddof=1)
-        delta_p = cov_matrix[0, 1]  # Cov(w_t, r_t)
+        delta_p = moments['cov']  # Cov(w_t, r_t)
 
         # 2. 被動成分：平均權重 × 平均報酬
-        nu_p = np.mean(w) * np.mean(r)
+        nu_p = moments['mean_w'] * moments['mean_r']
 
         # 3. 主動比率
         total = delta_p + nu_p
         theta_p = delta_p / total if abs(total) > 1e-10 else 0
 
         # === 統計診斷 ===
-        correlation = np.corrcoef(w, r)[0, 1]
-        n_obs = len(df_clean)
+        correlation = moments['corr']
+        n_obs = w.size
         statistical_significance = 'High' if n_obs > 100 else 'Moderate' if n_obs > 50 else 'Low'
 
         results = {
@@ -81,10 +128,10 @@ def compute_ap_decomposition(df: pd.DataFrame) -> Dict[str, float]:
             'Weight-Return Correlation': correlation,
             'Sample Size': n_obs,
             'Statistical Significance': statistical_significance,
-            'Weight Mean': np.mean(w),
-            'Weight Std': np.std(w),
-            'Return Mean': np.mean(r),
-            'Return Std': np.std(r)
+            'Weight Mean': moments['mean_w'],
+            'Weight Std': moments['std_w'],
+            'Return Mean': moments['mean_r'],
+            'Return Std': moments['std_r']
         }
 
         return results
@@ -99,6 +146,62 @@ def compute_ap_decomposition(df: pd.DataFrame) -> Dict[str, float]:
         }
 
 
+def _nav_returns(nav: np.ndarray) -> np.ndarray:
+    """NAV 日報酬，等同 pct_change().dropna()"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = nav[1:] / nav[:-1] - 1
+    return returns[~np.isnan(returns)]
+
+
+def excess_return_moments(excess_returns) -> Dict[str, float]:
+    """
+    超額報酬統計特徵：平均、標準差 (ddof=1)、偏度、峰度與勝率。
+
+    以同一組離均差一次求得二至四階動差，偏度與峰度採與 pandas
+    skew() / kurtosis() 相同之樣本偏誤修正 (峰度為超額峰度)。
+    """
+    x = np.asarray(excess_returns, dtype=float)
+    n = x.size
+    if n == 0:
+        return {'mean': np.nan, 'std': np.nan, 'skewness': np.nan,
+                'kurtosis': np.nan, 'win_rate': np.nan}
+
+    # 乘積與加總以 np.dot 一併完成，不另配置 d^3、d^4 暫存陣列
+    mean = x.mean()
+    deviation = x - mean
+    deviation_sq = deviation * deviation
+    m2 = deviation_sq.sum() / n
+    m3 = np.dot(deviation_sq, deviation) / n
+    m4 = np.dot(deviation_sq, deviation_sq) / n
+
+    std = np.sqrt(m2 * n / (n - 1)) if n > 1 else np.nan
+
+    # 與 pandas 相同，離均差平方和低於 (eps·max|x|)²·n 視為浮點誤差 (常數序列)，偏度與峰度記為 0
+    flat = m2 <= (np.finfo(float).eps * np.abs(x).max()) ** 2
+
+    if n < 3:
+        skewness = np.nan
+    elif flat:
+        skewness = 0.0
+    else:
+        skewness = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2 ** 1.5
+
+    if n < 4:
+        kurtosis = np.nan
+    elif flat:
+        kurtosis = 0.0
+    else:
+        kurtosis = (n - 1) / ((n - 2) * (n - 3)) * ((n + 1) * (m4 / m2 ** 2 - 3) + 6)
+
+    return {
+        'mean': mean,
+        'std': std,
+        'skewness': skewness,
+        'kurtosis': kurtosis,
+        'win_rate': np.count_nonzero(x > 0) / n
+    }
+
+
 def analyze_ap_components(df_active: pd.DataFrame, df_passive: pd.DataFrame) -> Dict[str, float]:
     """
     AP 擴充分析：比較主動策略與被動策略之超額表現與風險
@@ -112,23 +215,25 @@ def analyze_ap_components(df_active: pd.DataFrame, df_passive: pd.DataFrame) ->
     此分析有助於理解主動成分如何在不同市場狀況下發揮效果。
     """
 
-    active_returns = df_active['NAV'].pct_change().dropna()
-    passive_returns = df_passive['NAV'].pct_change().dropna()
+    active_returns = _nav_returns(df_active['NAV'].to_numpy(dtype=float))
+    passive_returns = _nav_returns(df_passive['NAV'].to_numpy(dtype=float))
 
-    min_length = min(len(active_returns), len(passive_returns))
-    active_returns = active_returns.iloc[-min_length:]
-    passive_returns = passive_returns.iloc[-min_length:]
+    min_length = min(active_returns.size, passive_returns.size)
+    active_returns = active_returns[active_returns.size - min_length:]
+    passive_returns = passive_returns[passive_returns.size - min_length:]
 
     excess_returns = active_returns - passive_returns
 
+    moments = excess_return_moments(excess_returns)
+
     analysis = {
-        'active_contribution': excess_returns.mean() * 252,
-        'active_volatility': excess_returns.std() * np.sqrt(252),
-        'information_ratio': (excess_returns.mean() / excess_returns.std()) if excess_returns.std() > 0 else 0,
-        'positive_periods_ratio': (excess_returns > 0).mean(),
+        'active_contribution': moments['mean'] * 252,
+        'active_volatility': moments['std'] * np.sqrt(252),
+        'information_ratio': (moments['mean'] / moments['std']) if moments['std'] > 0 else 0,
+        'positive_periods_ratio': moments['win_rate'],
         'maximum_active_drawdown': calculate_active_drawdown(excess_returns),
-        'excess_return_skewness': excess_returns.skew(),
-        'excess_return_kurtosis': excess_returns.kurtosis()
+        'excess_return_skewness': moments['skewness'],
+        'excess_return_kurtosis': moments['kurtosis']
     }
 
     if 'Weight' in df_active.columns:
@@ -145,14 +250,18 @@ def analyze_ap_components(df_active: pd.DataFrame, df_passive: pd.DataFrame) ->
     return analysis
 
 
-def calculate_active_drawdown(excess_returns: pd.Series) -> float:
+def calculate_active_drawdown(excess_returns) -> float:
     """
     計算主動管理超額報酬之最大回撤
     """
-    cumulative_excess = (1 + excess_returns).cumprod()
-    running_max = cumulative_excess.expanding().max()
-    drawdown = (cumulative_excess - running_max) / running_max
-    return drawdown.min()
+    excess = np.asarray(excess_returns, dtype=float)
+    # 略過 NaN (與 pandas cumprod() / expanding().max() / min() 之 skipna 行為一致)
+    cumulative_excess = np.cumprod(1.0 + excess[~np.isnan(excess)])
+    if cumulative_excess.size == 0:
+        return np.nan
+    running_max = np.fmax.accumulate(cumulative_excess)
+    drawdown = cumulative_excess / running_max - 1.0
+    return np.nanmin(drawdown)
 
 
 def validate_ap_theory(ap_results: Dict[str, float]) -> Dict[str, str]:
@@ -203,52 +312,156 @@ def validate_ap_theory(ap_results: Dict[str, float]) -> Dict[str, str]:
     return validation
 
 
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """以前綴和求各窗口 [i-window, i) 之總和，i = window, ..., n-1"""
+    prefix = np.concatenate(([0.0], np.cumsum(values)))
+    return prefix[window:-1] - prefix[:-window - 1]
+
+
+def _window_is_constant(values: np.ndarray, valid: np.ndarray, window: int) -> np.ndarray:
+    """
+    各窗口 [i-window, i) 內之有效值是否全部相同。
+
+    前綴和求得的變異數對常數窗口僅近似為 0，故另以「相鄰有效值變動次數」
+    精確判定，使常數窗口的相關係數記為 NaN、共變異數記為 0。
+    """
+    compressed = values[valid]
+    if compressed.size == 0:
+        return np.ones(max(values.size - window, 0), dtype=bool)
+
+    changes = np.concatenate(([0], np.cumsum(compressed[1:] != compressed[:-1])))
+    valid_prefix = np.concatenate(([0], np.cumsum(valid)))
+    first = valid_prefix[:-window - 1]
+    last = valid_prefix[window:-1] - 1
+    last_clipped = np.maximum(last, 0)
+    first_clipped = np.minimum(first, last_clipped)
+    return (last - first < 1) | (changes[last_clipped] == changes[first_clipped])
+
+
 def rolling_ap_decomposition(df: pd.DataFrame, window: int = 252) -> pd.DataFrame:
     """
     滾動 AP 分解：觀察 δp 與 θp 隨時間之穩定性
+
+    第 i 筆結果對應區間 [i-window, i)。各窗口的一、二階累加和由同一組
+    前綴和相減求得，整段序列僅需常數次線性掃描，與窗口長度無關。
     """
     if 'Weight' not in df.columns or 'Return' not in df.columns:
         return pd.DataFrame()
 
-    rolling_results = []
-
-    for i in range(window, len(df)):
-        window_data = df.iloc[i-window:i]
-        ap_result = compute_ap_decomposition(window_data)
+    weights = df['Weight'].to_numpy(dtype=float)
+    returns = df['Return'].to_numpy(dtype=float)
+    dates = df['Date'].values if 'Date' in df.columns else np.arange(len(df))
+
+    # 僅保留權重與報酬同時有效的樣本，與 compute_ap_decomposition 一致
+    valid = ~(np.isnan(weights) | np.isnan(returns))
+
+    # 以有效樣本平均平移資料後再累加，避免平方和相減造成的數值抵銷
+    shift_w = weights[valid].mean() if valid.any() else 0.0
+    shift_r = returns[valid].mean() if valid.any() else 0.0
+    dw = np.where(valid, weights - shift_w, 0.0)
+    dr = np.where(valid, returns - shift_r, 0.0)
+
+    n = _window_sums(valid.astype(float), window)
+    sum_w = _window_sums(dw, window)
+    sum_r = _window_sums(dr, window)
+    sum_ww = _window_sums(dw * dw, window)
+    sum_rr = _window_sums(dr * dr, window)
+    sum_wr = _window_sums(dw * dr, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_dw = sum_w / n
+        mean_dr = sum_r / n
+        ss_w = np.maximum(sum_ww - sum_w * mean_dw, 0.0)
+        ss_r = np.maximum(sum_rr - sum_r * mean_dr, 0.0)
+        ss_wr = sum_wr - sum_w * mean_dr
+
+        # 常數窗口之離均差平方和 (及交叉乘積) 精確記為 0
+        constant_w = _window_is_constant(weights, valid, window)
+        constant_r = _window_is_constant(returns, valid, window)
+        ss_w[constant_w] = 0.0
+        ss_r[constant_r] = 0.0
+        ss_wr[constant_w | constant_r] = 0.0
+
+        delta_p = ss_wr / (n - 1)
+        nu_p = (shift_w + mean_dw) * (shift_r + mean_dr)
+        std_product = np.sqrt(ss_w * ss_r)
+    correlation = np.full(n.size, np.nan)
+    np.divide(ss_wr, std_product, out=correlation, where=std_product > 0)
+
+    # 與 compute_ap_decomposition 一致：有效樣本不足 10 筆時各成分記為 0
+    sufficient = n >= 10
+
+    delta_p = np.where(sufficient, delta_p, 0.0)
+    nu_p = np.where(sufficient, nu_p, 0.0)
+    total = delta_p + nu_p
+    large_total = np.abs(total) > 1e-10
+    theta_p = np.where(large_total, delta_p / np.where(large_total, total, 1.0), 0.0)
+    correlation = np.where(sufficient, correlation, 0.0)
+
+    return pd.DataFrame({
+        'Date': dates[window:],
+        'Active_Component': delta_p,
+        'Passive_Component': nu_p,
+        'Active_Ratio': theta_p,
+        'Weight_Return_Correlation': correlation
+    })
+
+
+def _ap_strategy_summary(strategy_name: str, strategy_df: pd.DataFrame) -> Dict[str, float]:
+    """單一策略之 AP 分解摘要列 (模組層級函式，供子行程序列化呼叫)"""
+    ap_result = compute_ap_decomposition(strategy_df)
+
+    return {
+        'Strategy': strategy_name,
+        'Active_Component': ap_result.get('Active (δp)', 0),
+        'Passive_Component': ap_result.get('Passive (νp)', 0),
+        'Active_Ratio': ap_result.get('Active Ratio (θp)', 0),
+        'Weight_Return_Correlation': ap_result.get('Weight-Return Correlation', 0),
+        'Sample_Size': ap_result.get('Sample Size', 0)
+    }
 
-        rolling_results.append({
-            'Date': df.iloc[i]['Date'] if 'Date' in df.columns else i,
-            'Active_Component': ap_result.get('Active (δp)', 0),
-            'Passive_Component': ap_result.get('Passive (νp)', 0),
-            'Active_Ratio': ap_result.get('Active Ratio (θp)', 0),
-            'Weight_Return_Correlation': ap_result.get('Weight-Return Correlation', 0)
-        })
 
-    return pd.DataFrame(rolling_results)
+# 平行化門檻：策略數與總樣本數皆足夠時，多行程的序列化成本才值得
+PARALLEL_MIN_STRATEGIES = 4
+PARALLEL_MIN_ROWS = 1_000_000
 
 
-def compare_ap_strategies(strategies_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+def compare_ap_strategies(strategies_dict: Dict[str, pd.DataFrame],
+                          max_workers: Optional[int] = None) -> pd.DataFrame:
     """
     多策略 AP 分解結果比較
-    """
-    comparison_results = []
 
-    for strategy_name, strategy_df in strategies_dict.items():
-        try:
-            ap_result = compute_ap_decomposition(strategy_df)
+    各策略彼此獨立；策略數與總樣本數超過門檻時以多行程平行計算，
+    僅傳送 Weight 與 Return 欄位以降低序列化成本。
+    """
+    total_rows = sum(len(strategy_df) for strategy_df in strategies_dict.values())
+    use_processes = (len(strategies_dict) >= PARALLEL_MIN_STRATEGIES
+                     and total_rows >= PARALLEL_MIN_ROWS)
 
-            comparison_results.append({
-                'Strategy': strategy_name,
-                'Active_Component': ap_result.get('Active (δp)', 0),
-                'Passive_Component': ap_result.get('Passive (νp)', 0),
-                'Active_Ratio': ap_result.get('Active Ratio (θp)', 0),
-                'Weight_Return_Correlation': ap_result.get('Weight-Return Correlation', 0),
-                'Sample_Size': ap_result.get('Sample Size', 0)
-            })
+    comparison_results = []
 
-        except Exception as e:
-            print(f"[Warning] 策略 {strategy_name} AP 分解失敗: {e}")
-            continue
+    if use_processes:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for strategy_name, strategy_df in strategies_dict.items():
+                columns = [col for col in ('Weight', 'Return') if col in strategy_df.columns]
+                futures[strategy_name] = executor.submit(
+                    _ap_strategy_summary, strategy_name, strategy_df[columns]
+                )
+
+            for strategy_name, future in futures.items():
+                try:
+                    comparison_results.append(future.result())
+                except Exception as e:
+                    print(f"[Warning] 策略 {strategy_name} AP 分解失敗: {e}")
+                    continue
+    else:
+        for strategy_name, strategy_df in strategies_dict.items():
+            try:
+                comparison_results.append(_ap_strategy_summary(strategy_name, strategy_df))
+            except Exception as e:
+                print(f"[Warning] 策略 {strategy_name} AP 分解失敗: {e}")
+                continue
 
     comparison_df = pd.DataFrame(comparison_results)
 
@@ -288,6 +501,20 @@ def generate_ap_research_report(ap_results: Dict[str, float],
     return report
 
 
+def json_default(obj):
+    """
+    json.dump 的 default 轉換：NumPy 純量與陣列轉為原生數值與串列，
+    日期轉為 ISO 字串，其餘物件才退回 str()。
+    """
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Timestamp, datetime)):
+        return obj.isoformat()
+    return str(obj)
+
+
 def save_ap_research_documentation(ap_results: Dict[str, float],
                                    ap_analysis: Dict[str, float]) -> None:
     """
@@ -310,6 +537,6 @@ def save_ap_research_documentation(ap_results: Dict[str, float],
     }
 
     with open('results/ap_analysis/detailed_ap_results.json', 'w', encoding='utf-8') as f:
-        json.dump(detailed_results, f, indent=2, ensure_ascii=False, default=str)
+        json.dump(detailed_results, f, indent=2, ensure_ascii=False, default=json_default)
 
     print("[Info] AP 分解研究報告已保存")
\ No newline at end of file
@@ -1,5 +1,21 @@
 import pandas as pd
 import numpy as np
+import math
+
+# 日報酬年化波動度換算因子
+SQRT_252 = math.sqrt(252)
+
+def _sample_std(values):
+    """樣本標準差 (ddof=1)，樣本不足 2 筆時回傳 NaN，與 pandas std() 一致"""
+    return values.std(ddof=1) if values.size > 1 else np.nan
+
+def _max_consecutive_losses(returns):
+    """以遊程編碼 (run-length) 計算最長連續虧損天數"""
+    negative = (returns < 0).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], negative, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max()) if starts.size > 0 else 0
 
 def calculate_performance_metrics(df, risk_free_rate=0.02):
     """
@@ -19,7 +35,7 @@ def calculate_performance_metrics(df, risk_free_rate=0.02):
     if 'NAV' not in df.columns or 'Cumulative_Capital' not in df.columns:
         raise ValueError("缺少必要欄位：NAV 與 Cumulative_Capital")
 
-    nav_returns = df['NAV'].pct_change().fillna(0)
+    nav_returns = df['NAV'].pct_change().fillna(0).to_numpy()
 
     # === 基礎報酬指標 ===
     total_return = (df['NAV'].iloc[-1] / df['Cumulative_Capital'].iloc[-1]) - 1
@@ -28,33 +44,27 @@ def calculate_performance_metrics(df, risk_free_rate=0.02):
     annualized_return = (1 + total_return) ** (1 / years) - 1 if years > 0 else 0
 
     # === 風險指標 ===
-    annualized_volatility = nav_returns.std() * np.sqrt(252)
+    annualized_volatility = _sample_std(nav_returns) * SQRT_252
     sharpe_ratio = (annualized_return - risk_free_rate) / annualized_volatility if annualized_volatility > 0 else 0
 
     # === 回撤分析 ===
-    cumulative_returns = (1 + nav_returns).cumprod()
-    running_max = cumulative_returns.expanding().max()
-    drawdown = (cumulative_returns - running_max) / running_max
-    max_drawdown = drawdown.min()
+    cumulative_returns = np.cumprod(1.0 + nav_returns)
+    # fmax / nanmin 略過 NaN，與 pandas expanding().max() / min() 行為一致
+    running_max = np.fmax.accumulate(cumulative_returns)
+    drawdown = cumulative_returns / running_max - 1.0
+    max_drawdown = np.nanmin(drawdown)
 
     # === 其他關鍵指標 ===
     win_rate = (nav_returns > 0).mean()
     calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0
 
     negative_returns = nav_returns[nav_returns < 0]
-    downside_deviation = negative_returns.std() * np.sqrt(252)
+    downside_deviation = _sample_std(negative_returns) * SQRT_252
     sortino_ratio = (annualized_return - risk_free_rate) / downside_deviation if downside_deviation > 0 else 0
 
-    var_95 = nav_returns.quantile(0.05)
+    var_95 = np.quantile(nav_returns, 0.05)
 
-    consecutive_losses = 0
-    max_consecutive_losses = 0
-    for ret in nav_returns:
-        if ret < 0:
-            consecutive_losses += 1
-            max_consecutive_losses = max(max_consecutive_losses, consecutive_losses)
-        else:
-            consecutive_losses = 0
+    max_consecutive_losses = _max_consecutive_losses(nav_returns)
 
     # 回傳核心績效指標
     return {
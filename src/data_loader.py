@@ -1,8 +1,153 @@
 import yfinance as yf
+import numpy as np
 import pandas as pd
+from pandas.tseries.offsets import BDay
 import os
+import json
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def _download_yfinance(ticker: str, start: str, end: str, interval: str) -> pd.DataFrame:
+    """
+    下載並標準化 yfinance 資料：攤平欄位、依日期排序並去除重複日期。
+
+    使用 Ticker.history 而非 yf.download：後者每次呼叫都會重設模組層級的共用結果表，
+    多執行緒同時呼叫會互相覆寫；Ticker.history 直接回傳單一標的結果，可並行下載。
+    """
+    df = yf.Ticker(ticker).history(
+        start=start,
+        end=end,
+        interval=interval,
+        auto_adjust=True,
+        actions=False
+    )
+
+    if df.empty:
+        return df
+
+    # Ticker.history 之索引帶交易所時區，去除時區並保留當地日期，與快取資料一致
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df = df.reset_index()
+
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [col[0] if isinstance(col, tuple) else col for col in df.columns]
+
+    # 於載入時確保欄位為單層且不重複，下游策略即可將每欄視為純量序列處理
+    df.columns = pd.Index(list(df.columns))
+    duplicated_cols = df.columns[df.columns.duplicated()].tolist()
+    if df.columns.nlevels != 1 or duplicated_cols:
+        raise ValueError(f"[Error] 資料欄位無法攤平為單層，重複欄位：{duplicated_cols}")
+
+    required_cols = ['Date', 'Close']
+    missing_cols = [col for col in required_cols if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"[Error] 資料缺少必要欄位：{missing_cols}")
+
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.sort_values('Date').reset_index(drop=True)
+    df = df.drop_duplicates(subset=['Date']).reset_index(drop=True)
+    return df
+
+
+def _cache_meta_path(save_path: str) -> str:
+    """快取資料對應之參數紀錄檔路徑 (如 raw_data.meta.json)"""
+    return os.path.splitext(save_path)[0] + '.meta.json'
+
+
+def _parquet_path(save_path: str) -> str:
+    """資料檔對應之 Parquet 路徑"""
+    return os.path.splitext(save_path)[0] + '.parquet'
+
+
+def _read_data(save_path: str) -> pd.DataFrame:
+    """讀取資料檔，優先使用保留型別的 Parquet，無則退回 CSV"""
+    parquet_path = _parquet_path(save_path)
+    if os.path.exists(parquet_path):
+        return pd.read_parquet(parquet_path, engine='pyarrow')
+    return pd.read_csv(save_path, parse_dates=['Date'])
+
+
+def _write_data(df: pd.DataFrame, save_path: str) -> None:
+    """
+    以 Parquet 儲存資料 (欄式二進位格式，保留日期型別且讀寫較 CSV 快)。
+
+    save_path 為 .csv 時屬過渡期相容：同時輸出 CSV 與同名 .parquet 檔。
+    """
+    if save_path.endswith('.csv'):
+        df.to_csv(save_path, index=False)
+    df.to_parquet(_parquet_path(save_path), engine='pyarrow', index=False)
+
+
+def _load_cache(save_path: str, ticker: str, interval: str) -> Tuple[Optional[pd.DataFrame], dict]:
+    """
+    讀取本地快取資料。
+
+    僅在參數紀錄檔存在且標的、頻率皆相符時使用快取，
+    否則回傳 (None, {}) 以重新下載完整資料。
+    """
+    meta_path = _cache_meta_path(save_path)
+    if not (os.path.exists(save_path) and os.path.exists(meta_path)):
+        return None, {}
+
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('ticker') != ticker or meta.get('interval') != interval:
+            return None, {}
+
+        cached = _read_data(save_path)
+        if cached.empty:
+            return None, {}
+        return cached, meta
+
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[Warning] 快取讀取失敗，改為重新下載：{e}")
+        return None, {}
+
+
+def _save_cache(df: pd.DataFrame, save_path: str, ticker: str,
+                start: str, end: str, interval: str) -> None:
+    """儲存資料與參數紀錄檔，供下次執行判斷快取是否可用"""
+    save_dir = os.path.dirname(save_path)
+    if save_dir:
+        os.makedirs(save_dir, exist_ok=True)
+    _write_data(df, save_path)
+
+    # 已涵蓋期間以實際存入之最後一筆資料為準 (不超過要求之 end)，
+    # 避免資料源未回傳近期資料時，下次執行誤判快取已是最新
+    covered_end = min(pd.Timestamp(end), df['Date'].max() + pd.Timedelta(days=1))
+
+    meta = {
+        'ticker': ticker,
+        'start': start,
+        'end': covered_end.strftime('%Y-%m-%d'),
+        'interval': interval,
+        'fetched_at': datetime.now().isoformat(timespec='seconds')
+    }
+    with open(_cache_meta_path(save_path), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+
+    print(f"[Info] 資料已儲存至：{save_path}")
+
+
+def _overlap_matches(cached: pd.DataFrame, tail: pd.DataFrame,
+                     overlap_date: pd.Timestamp, rtol: float = 1e-6) -> bool:
+    """
+    檢查新下載尾段與快取於重疊 K 棒之收盤價是否一致。
+
+    資料以 auto_adjust=True 取得，除權息或分割後 Yahoo 會回溯調整整段歷史價格，
+    此時重疊 K 棒之收盤價即與快取不符，快取須整段重新下載而非直接接續。
+    尾段未包含重疊 K 棒時無法確認，視為不一致。
+    """
+    cached_close = cached.loc[cached['Date'] == overlap_date, 'Close']
+    tail_close = tail.loc[tail['Date'] == overlap_date, 'Close']
+    if cached_close.empty or tail_close.empty:
+        return False
+    return bool(np.isclose(tail_close.iloc[0], cached_close.iloc[-1], rtol=rtol, atol=0.0))
+
 
 def get_yfinance_data(
     ticker: str,
@@ -17,12 +162,18 @@ def get_yfinance_data(
     此函式為整個投資策略回測之資料來源，確保資料品質與一致性，
     並支援多種金融商品與時間頻率，為後續量化分析提供穩定的數據基礎。
 
+    若 save_path 已有相同標的與頻率之快取且涵蓋所需期間，直接讀取本地資料；
+    快取僅缺少近期資料時，只下載缺少的尾段並與快取合併；若重疊 K 棒之收盤價
+    與快取不符 (除權息或分割使還原價格基準變動)，則重新下載完整期間。
+    下載失敗 (回傳空表) 時沿用本地快取，且不更新快取紀錄。
+
     參數:
     - ticker: 股票代號 (如 '2330.TW'=台積電, 'AAPL'=蘋果)
     - start: 開始日期 (yyyy-mm-dd)
     - end: 結束日期 (yyyy-mm-dd)，預設為今日
     - interval: 資料頻率 ('1d'=日線, '1wk'=週線, '1mo'=月線)
-    - save_path: 資料儲存路徑
+    - save_path: 資料儲存路徑 (同時作為本地快取)，建議使用 .parquet；
+                 使用 .csv 時會另存同名 .parquet 檔
 
     回傳:
     - DataFrame: 標準化 OHLCV 表格
@@ -31,43 +182,63 @@ def get_yfinance_data(
     if end is None:
         end = datetime.today().strftime('%Y-%m-%d')
 
-    print(f"[Info] 開始下載 {ticker} 歷史資料：{start} ~ {end} (頻率：{interval})")
-
     try:
-        df = yf.download(
-            tickers=ticker,
-            start=start,
-            end=end,
-            interval=interval,
-            progress=True
-        )
+        cached, meta = _load_cache(save_path, ticker, interval) if save_path else (None, {})
 
-        if df.empty:
-            raise ValueError(f"[Error] 無法取得 {ticker} 的資料，請確認代號正確性。")
+        start_ts = pd.Timestamp(start)
+        end_ts = pd.Timestamp(end)
+
+        if cached is not None and pd.Timestamp(meta.get('start', cached['Date'].min())) <= start_ts:
+            cached_max = cached['Date'].max()
+            is_fresh = (pd.Timestamp(meta.get('end', cached_max)) >= end_ts
+                        or cached_max >= end_ts - BDay(1))
 
-        df = df.reset_index()
+            if is_fresh:
+                print(f"[Info] 使用本地快取：{save_path}")
+                df = cached
+            else:
+                # 尾段自快取最後一根 K 棒起下載，保留一根重疊資料供比對還原基準
+                tail_start = cached_max.strftime('%Y-%m-%d')
+                cache_start = meta.get('start', start)
+                print(f"[Info] 快取更新 {ticker} 近期資料：{tail_start} ~ {end} (頻率：{interval})")
+                tail = _download_yfinance(ticker, tail_start, end, interval)
 
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = [col[0] if isinstance(col, tuple) else col for col in df.columns]
+                if tail.empty:
+                    df = tail
+                elif _overlap_matches(cached, tail, cached_max):
+                    df = pd.concat([cached, tail], ignore_index=True)
+                    df = df.drop_duplicates(subset=['Date'], keep='last')
+                    df = df.sort_values('Date').reset_index(drop=True)
+                else:
+                    print(f"[Info] {ticker} 還原價格基準已變動 (除權息或分割)，重新下載完整資料：{cache_start} ~ {end}")
+                    df = _download_yfinance(ticker, cache_start, end, interval)
 
-        required_cols = ['Date', 'Close']
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            raise ValueError(f"[Error] 資料缺少必要欄位：{missing_cols}")
+                if df.empty:
+                    # 下載失敗時 Ticker.history 亦回傳空表，不覆寫快取以免誤記已涵蓋期間
+                    print(f"[Warning] {ticker} 近期資料下載失敗或無新資料，暫用本地快取：{save_path}")
+                    df = cached
+                else:
+                    _save_cache(df, save_path, ticker, cache_start, end, interval)
 
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df.sort_values('Date').reset_index(drop=True)
-        df = df.drop_duplicates(subset=['Date']).reset_index(drop=True)
+            df = df[(df['Date'] >= start_ts) & (df['Date'] < end_ts)].reset_index(drop=True)
+
+        else:
+            print(f"[Info] 開始下載 {ticker} 歷史資料：{start} ~ {end} (頻率：{interval})")
+            df = _download_yfinance(ticker, start, end, interval)
+
+            if df.empty:
+                raise ValueError(f"[Error] 無法取得 {ticker} 的資料，請確認代號正確性。")
+
+            if save_path:
+                _save_cache(df, save_path, ticker, start, end, interval)
+
+        if df.empty:
+            raise ValueError(f"[Error] 無法取得 {ticker} 的資料，請確認代號正確性。")
 
         print(f"[Info] 已成功取得 {ticker}：共 {len(df)} 筆資料")
         print(f"[Info] 期間：{df['Date'].min().strftime('%Y-%m-%d')} ~ {df['Date'].max().strftime('%Y-%m-%d')}")
         print(f"[Info] 價格範圍：${df['Close'].min():.2f} ~ ${df['Close'].max():.2f}")
 
-        if save_path:
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            df.to_csv(save_path, index=False)
-            print(f"[Info] 資料已儲存至：{save_path}")
-
         return df
 
     except Exception as e:
@@ -80,34 +251,46 @@ def get_multiple_tickers_data(
     start: str = '2019-01-01',
     end: Optional[str] = None,
     interval: str = '1d',
-    save_dir: str = 'results'
+    save_dir: str = 'results',
+    max_workers: int = 8
 ) -> dict:
     """
     批量下載多檔股票資料，用於投資組合分析與比較。
 
+    各標的以執行緒池並行處理 (I/O 密集，等待網路與磁碟時不受 GIL 限制)。
+
     參數:
     - tickers: 股票代號清單
     - start, end, interval: 與 get_yfinance_data() 相同
     - save_dir: 儲存目錄
+    - max_workers: 同時處理的標的數上限
 
     回傳:
-    - dict: {ticker: DataFrame}
+    - dict: {ticker: DataFrame}，依 tickers 原始順序排列
     """
-    results = {}
-    successful_downloads = 0
+    downloaded = {}
 
     print(f"[Info] 開始批次下載，總共 {len(tickers)} 檔標的。")
 
-    for i, ticker in enumerate(tickers, 1):
-        try:
-            print(f"[Info] ({i}/{len(tickers)}) 處理中：{ticker}")
-            save_path = os.path.join(save_dir, f"{ticker.replace('.', '_')}.csv")
-            df = get_yfinance_data(ticker, start, end, interval, save_path)
-            results[ticker] = df
-            successful_downloads += 1
-        except Exception as e:
-            print(f"[Warning] 跳過 {ticker}：{e}")
-            continue
+    if not tickers:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+        futures = {}
+        for ticker in tickers:
+            save_path = os.path.join(save_dir, f"{ticker.replace('.', '_')}.parquet")
+            futures[executor.submit(get_yfinance_data, ticker, start, end, interval, save_path)] = ticker
+
+        for i, future in enumerate(as_completed(futures), 1):
+            ticker = futures[future]
+            try:
+                downloaded[ticker] = future.result()
+                print(f"[Info] ({i}/{len(tickers)}) 完成：{ticker}")
+            except Exception as e:
+                print(f"[Warning] 跳過 {ticker}：{e}")
+
+    results = {ticker: downloaded[ticker] for ticker in tickers if ticker in downloaded}
+    successful_downloads = len(results)
 
     print(f"[Info] 批次下載完成：成功 {successful_downloads}/{len(tickers)} 檔 ({successful_downloads/len(tickers)*100:.1f}%)")
     return results
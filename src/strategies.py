@@ -8,6 +8,86 @@ def compute_daily_returns(df):
     return df
 
 
+def _pct_change(values, periods):
+    """等同 pct_change(periods).fillna(0)，前 periods 筆與缺值以 0 填補"""
+    change = np.zeros_like(values)
+    if 0 < periods < len(values):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change[periods:] = values[periods:] / values[:-periods] - 1
+    return np.where(np.isnan(change), 0.0, change)
+
+
+def _first_trading_day_mask(dates):
+    """標記每月第一個交易日（資料須已依日期排序）"""
+    # 以 year*12 + month 整數鍵區分月份，避免跨年同月份被誤判為同一月
+    dates = pd.DatetimeIndex(dates)
+    year_month = dates.year.to_numpy(dtype=np.int32) * 12 + dates.month.to_numpy(dtype=np.int32)
+    mask = np.empty(len(year_month), dtype=bool)
+    if len(year_month) > 0:
+        mask[0] = True
+        np.not_equal(year_month[1:], year_month[:-1], out=mask[1:])
+    return mask
+
+
+def _linear_nav(contribution, growth):
+    """
+    遞迴 V_t = (V_{t-1} + c_t) * g_t (V_{-1} = 0) 之封閉解。
+
+    g_t <= 0 (單日虧損達 100% 以上) 時無法取對數，於該日切段：
+    段內以對數空間累積乘積計算，段首承接前段結轉之淨值 (可能為負，與逐日遞迴一致)。
+    """
+    nav = np.empty_like(growth)
+    breaks = np.flatnonzero(growth <= 0)
+    carried = 0.0
+    start = 0
+    for stop in [*breaks, len(growth)]:
+        if stop > start:
+            log_growth = np.log(growth[start:stop])
+            cum_log_growth = np.cumsum(log_growth)
+            prior_log_growth = cum_log_growth - log_growth
+            nav[start:stop] = np.exp(cum_log_growth) * (
+                carried + np.cumsum(contribution[start:stop] * np.exp(-prior_log_growth))
+            )
+            carried = nav[stop - 1]
+        if stop < len(growth):
+            carried = (carried + contribution[stop]) * growth[stop]
+            nav[stop] = carried
+        start = stop + 1
+    return nav
+
+
+def _momentum_nav(close, first_day_mask, monthly_amount, lookback, weight_config):
+    """
+    動量 DCA 核心運算：輸入收盤價陣列，一次產出報酬、動量、權重、投入與 NAV。
+
+    僅以 ndarray 運算，不經過 DataFrame 欄位存取。
+    """
+    # 日報酬與 lookback 日累積報酬皆直接由收盤價比值求得，只掃描一次收盤價序列
+    returns = _pct_change(close, 1)
+    rolling_return = _pct_change(close, lookback)
+
+    # 根據動量信號決定權重：
+    # 正報酬加碼，負報酬減碼，依強弱調整倍率。
+    # _pct_change 已將缺值補 0，權重與報酬皆不含 NaN
+    threshold = weight_config['threshold']
+    weight = np.select(
+        [rolling_return > threshold, rolling_return > 0, rolling_return > -threshold],
+        [weight_config['strong_up'], weight_config['mild_up'], weight_config['mild_down']],
+        default=weight_config['strong_down']
+    )
+
+    contribution = np.where(first_day_mask, monthly_amount, 0.0)
+
+    # NAV 運算式：
+    # NAV_t = [NAV_{t-1} + 當日投入] * (1 + 當日報酬 * 當日權重)
+    # 展開為封閉解 NAV_t = Σ_{k<=t} c_k * Π_{j=k..t} g_j，於對數空間計算累積乘積以避免溢位
+    growth = 1.0 + returns * weight
+    nav = _linear_nav(contribution, growth)
+    nav = np.maximum(nav, 0)
+
+    return returns, rolling_return, weight, contribution, nav
+
+
 def compute_dca_nav(df, monthly_amount=1.0):
     """
     定期定額 Buy-and-Hold 策略
@@ -18,42 +98,28 @@ def compute_dca_nav(df, monthly_amount=1.0):
     - 持股部位持續累積，不做調整
 
     本策略為 AP 分解的「純被動」基準組，對應市場曝險 (β)。
-    """
-    df = df.copy()
-
-    if 'Date' not in df.columns:
-        df['Date'] = df.index
-    df['Date'] = pd.to_datetime(df['Date'])
-
-    df['Contribution'] = 0.0
-    df['MonthYear'] = df['Date'].dt.to_period('M')
-    first_day_mask = df.groupby('MonthYear')['Date'].transform('min') == df['Date']
-    df.loc[first_day_mask, 'Contribution'] = monthly_amount
-
-    df['Cumulative_Capital'] = df['Contribution'].cumsum()
-    df = compute_daily_returns(df)
-
-    units = 0.0
-    nav = []
 
-    for _, row in df.iterrows():
-        contribution = row['Contribution']
-        close_price = row['Close']
-
-        if isinstance(contribution, pd.Series):
-            contribution = contribution.iloc[0]
-        if isinstance(close_price, pd.Series):
-            close_price = close_price.iloc[0]
+    不修改輸入資料，回傳僅含日期、收盤價與策略欄位之新表格。
+    """
+    dates = pd.to_datetime(df['Date'] if 'Date' in df.columns else df.index)
+    close = df['Close'].to_numpy(dtype=float)
 
-        if contribution > 0 and close_price > 0:
-            buy_units = contribution / close_price
-            units += buy_units
+    contribution = np.where(_first_trading_day_mask(dates), monthly_amount, 0.0)
 
-        total_value = units * close_price if close_price > 0 else 0
-        nav.append(total_value)
+    # 每月投入換算為買入股數後累加，持股市值即為 NAV
+    valid_price = close > 0
+    buy_units = np.where(valid_price, contribution / np.where(valid_price, close, 1.0), 0.0)
+    units = np.cumsum(buy_units)
+    nav = np.where(valid_price, units * close, 0.0)
 
-    df['NAV'] = nav
-    return df
+    return pd.DataFrame({
+        'Date': dates,
+        'Close': close,
+        'Contribution': contribution,
+        'Cumulative_Capital': np.cumsum(contribution),
+        'Return': _pct_change(close, 1),
+        'NAV': nav
+    }, index=df.index)
 
 
 def compute_momentum_dca_nav(df, lookback=5, monthly_amount=1.0, weight_config=None):
@@ -85,8 +151,6 @@ def compute_momentum_dca_nav(df, lookback=5, monthly_amount=1.0, weight_config=N
     - 權重與報酬具顯著正相關
     - θp 在 0~1 合理區間
     """
-    df = df.copy()
-
     if weight_config is None:
         weight_config = {
             'strong_up': 1.3,
@@ -96,58 +160,21 @@ def compute_momentum_dca_nav(df, lookback=5, monthly_amount=1.0, weight_config=N
             'threshold': 0.05
         }
 
-    if 'Date' not in df.columns:
-        df['Date'] = df.index
-    df['Date'] = pd.to_datetime(df['Date'])
-
-    df = compute_daily_returns(df)
-
-    df['Rolling_Return'] = df['Close'].pct_change(periods=lookback).fillna(0)
-
-    def calculate_weight(rolling_return, config):
-        """
-        根據動量信號決定權重：
-        正報酬加碼，負報酬減碼，依強弱調整倍率。
-        """
-        if pd.isna(rolling_return):
-            return 1.0
-        elif rolling_return > config['threshold']:
-            return config['strong_up']
-        elif rolling_return > 0:
-            return config['mild_up']
-        elif rolling_return > -config['threshold']:
-            return config['mild_down']
-        else:
-            return config['strong_down']
-
-    df['Weight'] = df['Rolling_Return'].apply(lambda x: calculate_weight(x, weight_config))
-
-    df['Contribution'] = 0.0
-    df['MonthYear'] = df['Date'].dt.to_period('M')
-    first_day_mask = df.groupby('MonthYear')['Date'].transform('min') == df['Date']
-    df.loc[first_day_mask, 'Contribution'] = monthly_amount
-
-    df['Cumulative_Capital'] = df['Contribution'].cumsum()
-
-    nav = []
-    prev_nav = 0.0
-
-    for _, row in df.iterrows():
-        c = row['Contribution']  # 當日資金流入
-        r = row['Return']        # 當日報酬
-        w = row['Weight']        # 當日權重
-
-        if isinstance(c, pd.Series): c = c.iloc[0]
-        if isinstance(r, pd.Series): r = r.iloc[0]
-        if isinstance(w, pd.Series): w = w.iloc[0]
-
-        # NAV 運算式：
-        # NAV_t = [NAV_{t-1} + 當日投入] * (1 + 當日報酬 * 當日權重)
-        prev_nav += c
-        if not pd.isna(r) and not pd.isna(w):
-            prev_nav *= (1 + r * w)
-
-        nav.append(max(prev_nav, 0))
-
-    df['NAV'] = nav
-    return df
\ No newline at end of file
+    dates = pd.to_datetime(df['Date'] if 'Date' in df.columns else df.index)
+    close = df['Close'].to_numpy(dtype=float)
+    first_day_mask = _first_trading_day_mask(dates)
+
+    returns, rolling_return, weight, contribution, nav = _momentum_nav(
+        close, first_day_mask, monthly_amount, lookback, weight_config
+    )
+
+    return pd.DataFrame({
+        'Date': dates,
+        'Close': close,
+        'Return': returns,
+        'Rolling_Return': rolling_return,
+        'Weight': weight,
+        'Contribution': contribution,
+        'Cumulative_Capital': np.cumsum(contribution),
+        'NAV': nav
+    }, index=df.index)
@@ -1,21 +1,39 @@
 # src/visualize.py
 
+import io
+import os
+import warnings
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import pandas as pd
 import numpy as np
 import seaborn as sns
 from matplotlib.patches import Rectangle
-import warnings
-warnings.filterwarnings('ignore')
-
-# 設定專業的視覺樣式
-plt.style.use('default')
-plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'Arial Unicode MS', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
-plt.rcParams['figure.facecolor'] = 'white'
-plt.rcParams['axes.facecolor'] = 'white'
-plt.rcParams['savefig.facecolor'] = 'white'
-plt.rcParams['savefig.bbox'] = 'tight'
+from matplotlib.collections import PolyCollection
+import matplotlib.dates as mdates
+from matplotlib import font_manager
+from src.ap_decomposition import rolling_ap_decomposition, excess_return_moments
+
+# 設定專業的視覺樣式：樣式檔於模組載入時套用一次
+STYLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boa_style.mplstyle')
+plt.style.use(['default', STYLE_PATH])
+
+def _preload_fonts():
+    """預先解析樣式所列字型，首張圖表 (及 fork 出的子行程) 不必再於繪圖時查找"""
+    for family in plt.rcParams['font.sans-serif']:
+        try:
+            font_manager.findfont(font_manager.FontProperties(family=family),
+                                  fallback_to_default=False)
+        except ValueError:
+            continue  # 系統未安裝此字型，由清單中下一個字型遞補
+
+_preload_fonts()
 
 # 專業投行配色方案 (Bank of America inspired)
 COLORS = {
@@ -31,7 +49,158 @@ COLORS = {
     'active': '#E31837'            # 主動策略色
 }
 
-def create_ap_focused_analysis(df_passive, df_active, passive_metrics, active_metrics, ap_results):
+# 輸出設定：螢幕/報告內嵌用 150 dpi 已足夠，PNG 採低壓縮等級以節省編碼時間
+# (印刷品質可自行調高 FIG_DPI，或提高 PNG_COMPRESS 以換取較小檔案)
+FIG_DPI = 150
+PNG_COMPRESS = 1
+
+def _build_performance_figure(fig, df_passive, df_active, passive_metrics, active_metrics, ap_results, series):
+    """圖表1：策略績效比較 (核心圖表)"""
+    fig.set_size_inches(14, 8)
+    ax = fig.subplots()
+    create_performance_comparison(ax, df_passive, df_active, passive_metrics, active_metrics)
+
+def _build_ap_decomposition_figure(fig, df_passive, df_active, passive_metrics, active_metrics, ap_results, series):
+    """圖表2：AP分解核心結果"""
+    fig.set_size_inches(16, 7)
+    ax_a, ax_b = fig.subplots(1, 2)
+    create_ap_decomposition_chart(ax_a, ap_results)
+    create_theory_validation_table(ax_b, ap_results, passive_metrics, active_metrics)
+
+def _build_weight_return_figure(fig, df_passive, df_active, passive_metrics, active_metrics, ap_results, series):
+    """圖表3：權重-報酬關係與主動貢獻"""
+    fig.set_size_inches(16, 7)
+    ax_a, ax_b = fig.subplots(1, 2)
+    create_weight_return_analysis(ax_a, df_active)
+    create_active_component_timeline(ax_b, df_active, series)
+
+def _build_excess_return_figure(fig, df_passive, df_active, passive_metrics, active_metrics, ap_results, series):
+    """圖表4：超額報酬分析"""
+    fig.set_size_inches(16, 7)
+    ax_a, ax_b = fig.subplots(1, 2)
+    create_excess_return_distribution(ax_a, series)
+    create_rolling_performance(ax_b, df_passive, df_active, series)
+
+def _build_metrics_figure(fig, df_passive, df_active, passive_metrics, active_metrics, ap_results, series):
+    """圖表5：策略績效綜合比較表"""
+    fig.set_size_inches(16, 8)
+    ax_a, ax_b = fig.subplots(1, 2)
+    create_performance_metrics_table(ax_a, passive_metrics, active_metrics)
+    create_rolling_ap_analysis(ax_b, series)
+
+# 理論驗證結果 -> (儲存格底色, 文字顏色)
+VALIDATION_STYLES = {
+    'PASS': ('#D5EFDB', 'green'),   # 淺綠
+    'WARN': ('#FFF2CC', 'orange'),  # 淺黃
+    'FAIL': ('#FADBD8', 'red'),     # 淺紅
+}
+
+# 數值越小越好的績效指標 (其餘指標數值越大越好)
+LOWER_IS_BETTER_METRICS = ('annualized_volatility', 'max_drawdown')
+
+# (輸出檔名, 進度說明, 圖表建構函式：於傳入的空白 Figure 上繪製)
+FIGURE_SPECS = [
+    ('01_performance_comparison.png', '策略績效比較', _build_performance_figure),
+    ('02_ap_decomposition_analysis.png', 'AP分解理論驗證', _build_ap_decomposition_figure),
+    ('03_weight_return_analysis.png', '權重報酬關係分析', _build_weight_return_figure),
+    ('04_excess_return_analysis.png', '超額報酬特徵分析', _build_excess_return_figure),
+    ('05_comprehensive_metrics.png', '策略績效綜合比較', _build_metrics_figure),
+]
+
+ROLLING_RETURN_WINDOW = 30
+ROLLING_AP_WINDOW = 60
+
+# 折線圖最多保留的頂點數 (約為輸出圖寬的像素數)，超過時以 LTTB 降採樣
+LTTB_POINTS = 2000
+
+def _daily_returns(nav):
+    """與 Date 對齊的淨值日報酬 (等同 pct_change())，首筆為 NaN"""
+    nav = np.asarray(nav, dtype=float)
+    returns = np.full(nav.size, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = nav[1:] / nav[:-1] - 1
+    return returns
+
+def _rolling_mean(values, window):
+    """尾端對齊的移動平均 (等同 rolling(window).mean())，前 window-1 筆為 NaN"""
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.size, np.nan)
+    if values.size >= window:
+        result[window - 1:] = np.convolve(values, np.ones(window) / window, mode='valid')
+    return result
+
+def _prepare_return_series(df_passive, df_active):
+    """
+    一次計算各圖表共用的報酬序列，避免各繪圖函式重複 pct_change。
+
+    Returns:
+        dict: active / passive 日報酬、尾端對齊的日超額報酬 (%)、
+              與 Date 對齊的 30 天滾動平均報酬 (%)，以及 60 天滾動 AP 分解
+              (計算失敗時 rolling_ap 為 None，錯誤訊息存於 rolling_ap_error)
+    """
+    passive_daily = _daily_returns(df_passive['NAV'].to_numpy())
+    active_daily = _daily_returns(df_active['NAV'].to_numpy())
+
+    # 等同 pct_change().dropna() 後取尾端對齊
+    passive = passive_daily[~np.isnan(passive_daily)]
+    active = active_daily[~np.isnan(active_daily)]
+    min_len = min(len(active), len(passive))
+    excess = (active[len(active) - min_len:] - passive[len(passive) - min_len:]) * 100
+
+    # 滾動 AP 分解只算一次，供圖表直接取用
+    rolling_ap, rolling_ap_error = None, None
+    try:
+        rolling_ap = rolling_ap_decomposition(df_active, window=ROLLING_AP_WINDOW)
+    except Exception as e:
+        rolling_ap_error = str(e)
+
+    return {
+        'passive_returns': passive,
+        'active_returns': active,
+        'excess': excess,
+        'passive_rolling': _rolling_mean(passive_daily, ROLLING_RETURN_WINDOW) * 100,
+        'active_rolling': _rolling_mean(active_daily, ROLLING_RETURN_WINDOW) * 100,
+        'rolling_ap': rolling_ap,
+        'rolling_ap_error': rolling_ap_error,
+    }
+
+# 每個行程重複使用同一張 Figure 與 Agg canvas，圖表之間僅以 clf() 清空
+_FIGURE = None
+
+def _reusable_figure():
+    """取得本行程共用的 Figure (首次呼叫時建立)"""
+    global _FIGURE
+    if _FIGURE is None:
+        # 採 constrained layout 於存檔時一併排版，省去 bbox_inches='tight' 為量測邊界而多一次的繪製
+        _FIGURE = Figure(layout='constrained')
+        FigureCanvasAgg(_FIGURE)
+        _FIGURE.get_layout_engine().set(w_pad=0.05, h_pad=0.05)
+    return _FIGURE
+
+def _render_figure(index, figure_args, output_dir):
+    """建構並輸出單張圖表 (模組層級函式，供子行程呼叫)"""
+    filename, _, builder = FIGURE_SPECS[index]
+    path = os.path.join(output_dir, filename)
+
+    fig = _reusable_figure()
+    try:
+        with warnings.catch_warnings():
+            # 系統缺少中文字型時 matplotlib 會對每個缺字發出警告，僅於繪圖期間忽略
+            warnings.filterwarnings('ignore', message='Glyph .* missing from', category=UserWarning)
+            builder(fig, *figure_args)
+            # 先編碼至記憶體，再一次寫入磁碟，避免 PNG 編碼過程中的大量小區塊寫入
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', dpi=FIG_DPI,
+                        pil_kwargs={'compress_level': PNG_COMPRESS})
+    finally:
+        fig.clf()
+
+    with open(path, 'wb') as f:
+        f.write(buffer.getbuffer())
+    return path
+
+def create_ap_focused_analysis(df_passive, df_active, passive_metrics, active_metrics, ap_results,
+                               max_workers=None):
     """
     生成完整的 AP 分解學術研究圖表集
     
@@ -39,84 +208,170 @@ def create_ap_focused_analysis(df_passive, df_active, passive_metrics, active_me
     - 學術專業性：清晰的圖表標題和標注
     - 視覺層次感：重點突出，次要信息適度
     - 備審友善性：圖表獨立完整，便於選用
+
+    五張圖表彼此獨立，多核心環境下以多行程平行繪製 (Agg 後端)；
+    max_workers 預設為 min(5, CPU 核心數)，單核心時直接於本行程依序繪製。
     """
     
-    import os
-    os.makedirs('results/ap_analysis', exist_ok=True)
+    output_dir = 'results/ap_analysis'
+    os.makedirs(output_dir, exist_ok=True)
     
     print("📊 生成學術研究圖表...")
     
     # 設定非互動模式
     plt.ioff()
-    
-    try:
-        # 圖表1：策略績效比較 (核心圖表)
-        print("   生成圖表1: 策略績效比較")
-        fig1, ax1 = plt.subplots(figsize=(14, 8))
-        create_performance_comparison(ax1, df_passive, df_active, passive_metrics, active_metrics)
-        plt.tight_layout()
-        plt.savefig('results/ap_analysis/01_performance_comparison.png', dpi=300, bbox_inches='tight')
-        plt.close(fig1)
-
-        # 圖表2：AP分解核心結果
-        print("   生成圖表2: AP分解理論驗證")
-        fig2, (ax2a, ax2b) = plt.subplots(1, 2, figsize=(16, 7))
-        create_ap_decomposition_chart(ax2a, ap_results)
-        create_theory_validation_table(ax2b, ap_results, passive_metrics, active_metrics)
-        plt.tight_layout()
-        plt.savefig('results/ap_analysis/02_ap_decomposition_analysis.png', dpi=300, bbox_inches='tight')
-        plt.close(fig2)
-
-        # 圖表3：權重-報酬關係與主動貢獻
-        print("   生成圖表3: 權重報酬關係分析")
-        fig3, (ax3a, ax3b) = plt.subplots(1, 2, figsize=(16, 7))
-        create_weight_return_analysis(ax3a, df_active)
-        create_active_component_timeline(ax3b, df_passive, df_active)
-        plt.tight_layout()
-        plt.savefig('results/ap_analysis/03_weight_return_analysis.png', dpi=300, bbox_inches='tight')
-        plt.close(fig3)
-
-        # 圖表4：超額報酬分析
-        print("   生成圖表4: 超額報酬特徵分析")
-        fig4, (ax4a, ax4b) = plt.subplots(1, 2, figsize=(16, 7))
-        create_excess_return_distribution(ax4a, df_passive, df_active)
-        create_rolling_performance(ax4b, df_passive, df_active)
-        plt.tight_layout()
-        plt.savefig('results/ap_analysis/04_excess_return_analysis.png', dpi=300, bbox_inches='tight')
-        plt.close(fig4)
-
-        # 圖表5：策略績效綜合比較表
-        print("   生成圖表5: 策略績效綜合比較")
-        fig5, (ax5a, ax5b) = plt.subplots(1, 2, figsize=(16, 8))
-        create_performance_metrics_table(ax5a, passive_metrics, active_metrics)
-        create_rolling_ap_analysis(ax5b, df_active)
-        plt.tight_layout()
-        plt.savefig('results/ap_analysis/05_comprehensive_metrics.png', dpi=300, bbox_inches='tight')
-        plt.close(fig5)
 
+    series = _prepare_return_series(df_passive, df_active)
+    figure_args = (df_passive, df_active, passive_metrics, active_metrics, ap_results, series)
+    if max_workers is None:
+        max_workers = min(len(FIGURE_SPECS), os.cpu_count() or 1)
+
+    failed = 0
+
+    if max_workers <= 1:
+        for index, (_, title, _) in enumerate(FIGURE_SPECS):
+            print(f"   生成圖表{index + 1}: {title}")
+            try:
+                _render_figure(index, figure_args, output_dir)
+            except Exception as e:
+                print(f"❌ 圖表生成錯誤: {e}")
+                failed += 1
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_render_figure, index, figure_args, output_dir): index
+                       for index in range(len(FIGURE_SPECS))}
+
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    future.result()
+                    print(f"   完成圖表{index + 1}: {FIGURE_SPECS[index][1]}")
+                except Exception as e:
+                    print(f"❌ 圖表{index + 1}生成錯誤: {e}")
+                    failed += 1
+
+    if failed == 0:
         print("✅ 所有圖表已生成並保存至 results/ap_analysis/")
-        
-    except Exception as e:
-        print(f"❌ 圖表生成錯誤: {e}")
+
+def _lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 降採樣，回傳保留點的索引 (含首尾兩點)。
+
+    中間各點均分為 n_out-2 個桶，每桶保留與「前一保留點、下一桶平均點」
+    圍成三角形面積最大的點，以極少頂點保留折線的峰谷形狀。
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    counts = np.diff(edges)
+    next_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1])[1:] / counts[1:], x[-1])
+    next_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1])[1:] / counts[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for k in range(n_out - 2):
+        bucket_x = x[edges[k]:edges[k + 1]]
+        bucket_y = y[edges[k]:edges[k + 1]]
+        area = np.abs((x[prev] - next_x[k]) * (bucket_y - y[prev])
+                      - (x[prev] - bucket_x) * (next_y[k] - y[prev]))
+        prev = edges[k] + int(np.argmax(area))
+        selected[k + 1] = prev
+    return selected
+
+def _plot_downsampled(ax, dates, values, **kwargs):
+    """將序列 LTTB 降採樣至 LTTB_POINTS 個頂點後繪製折線 (略過 NaN)"""
+    dates = np.asarray(dates)
+    values = np.asarray(values, dtype=float)
+    finite = np.flatnonzero(np.isfinite(values))
+    keep = finite[_lttb(mdates.date2num(dates[finite]), values[finite], LTTB_POINTS)]
+    return ax.plot(dates[keep], values[keep], **kwargs)
+
+@contextmanager
+def _deferred_autoscale(ax):
+    """批次加入多組圖形期間暫停自動縮放，結束後依全部圖形一次重算座標範圍"""
+    ax.set_autoscale_on(False)
+    try:
+        yield ax
+    finally:
+        ax.relim()
+        ax.autoscale()
+
+def _fill_between_sign_runs(ax, x, y_base, y, alpha, labels=(None, None), interpolate=False):
+    """
+    依 y >= y_base 將序列切為正負連續區段，各以單一 PolyCollection 填色。
+
+    等同兩次 fill_between(where=...)，但遮罩與區段邊界只計算一次，
+    且不需 matplotlib 逐點展開遮罩。interpolate=True 時如同
+    fill_between(interpolate=True)，以線性內插求出兩線交點，
+    使正負區段於交點處接合。
+    """
+    x = np.asarray(x, dtype=float)
+    y_base = np.broadcast_to(np.asarray(y_base, dtype=float), np.shape(y))
+    y = np.asarray(y, dtype=float)
+    if y.size == 0:
+        return
+
+    diff = y - y_base
+    positive = diff >= 0
+    boundaries = np.flatnonzero(positive[1:] != positive[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [y.size]))
+
+    if interpolate and boundaries.size:
+        # 交界 b 位於第 b-1 與第 b 點之間，求 diff 線性內插為 0 之處
+        before, after = boundaries - 1, boundaries
+        t = diff[before] / (diff[before] - diff[after])
+        cross_x = x[before] + t * (x[after] - x[before])
+        cross_y = y_base[before] + t * (y_base[after] - y_base[before])
+
+    segments = {True: [], False: []}
+    for k, (start, end) in enumerate(zip(starts, ends)):
+        xs = x[start:end]
+        upper = y[start:end]
+        lower = y_base[start:end]
+        if interpolate and k > 0:
+            xs = np.concatenate(([cross_x[k - 1]], xs))
+            upper = np.concatenate(([cross_y[k - 1]], upper))
+            lower = np.concatenate(([cross_y[k - 1]], lower))
+        if interpolate and k < boundaries.size:
+            xs = np.concatenate((xs, [cross_x[k]]))
+            upper = np.concatenate((upper, [cross_y[k]]))
+            lower = np.concatenate((lower, [cross_y[k]]))
+        segments[bool(positive[start])].append(np.column_stack((
+            np.concatenate((xs, xs[::-1])),
+            np.concatenate((upper, lower[::-1]))
+        )))
+
+    for is_positive, color, label in ((True, COLORS['positive'], labels[0]),
+                                      (False, COLORS['negative'], labels[1])):
+        ax.add_collection(PolyCollection(segments[is_positive], color=color,
+                                         alpha=alpha, label=label), autolim=False)
 
 def create_performance_comparison(ax, df_passive, df_active, passive_metrics, active_metrics):
     """策略績效比較圖表 - 專業投行風格"""
     
-    # 主要曲線 - 使用BOA配色
-    ax.plot(df_passive['Date'], df_passive['NAV'],
-           label='被動策略 (Passive DCA)', linewidth=3, 
-           color=COLORS['navy_blue'], alpha=0.9)
-    ax.plot(df_active['Date'], df_active['NAV'],
-           label='主動策略 (Momentum DCA)', linewidth=3, 
-           color=COLORS['primary_red'], alpha=0.9)
-
-    # 超額報酬填充區域
-    ax.fill_between(df_active['Date'], df_passive['NAV'], df_active['NAV'],
-                    where=(df_active['NAV'] >= df_passive['NAV']),
-                    alpha=0.25, color=COLORS['positive'], label='正向超額報酬')
-    ax.fill_between(df_active['Date'], df_passive['NAV'], df_active['NAV'],
-                    where=(df_active['NAV'] < df_passive['NAV']),
-                    alpha=0.25, color=COLORS['negative'], label='負向超額報酬')
+    passive_dates = df_passive['Date'].to_numpy()
+    passive_nav = df_passive['NAV'].to_numpy()
+    active_dates = df_active['Date'].to_numpy()
+    active_nav = df_active['NAV'].to_numpy()
+
+    with _deferred_autoscale(ax):
+        # 主要曲線 - 使用BOA配色
+        _plot_downsampled(ax, passive_dates, passive_nav,
+                          label='被動策略 (Passive DCA)', linewidth=3, 
+                          color=COLORS['navy_blue'], alpha=0.9)
+        _plot_downsampled(ax, active_dates, active_nav,
+                          label='主動策略 (Momentum DCA)', linewidth=3, 
+                          color=COLORS['primary_red'], alpha=0.9)
+
+        # 超額報酬填充區域
+        _fill_between_sign_runs(ax, mdates.date2num(active_dates), passive_nav, active_nav,
+                               alpha=0.25, labels=('正向超額報酬', '負向超額報酬'))
 
     # 績效摘要資訊框
     excess_return = active_metrics['total_return'] - passive_metrics['total_return']
@@ -157,14 +412,9 @@ def create_ap_decomposition_chart(ax, ap_results):
     bars = ax.bar(components, values, color=colors, alpha=0.8, 
                  edgecolor=COLORS['navy_blue'], linewidth=2, width=0.6)
 
-    # 添加數值標籤
-    for bar, value in zip(bars, values):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width() / 2., 
-               height + 0.0001 * np.sign(height),
-               f'{value:.6f}', ha='center',
-               va='bottom' if height > 0 else 'top',
-               fontweight='bold', fontsize=11, color=COLORS['navy_blue'])
+    # 添加數值標籤 (負值柱狀自動標於柱底下方)
+    ax.bar_label(bars, labels=[f'{value:.6f}' for value in values], label_type='edge',
+                 padding=3, fontweight='bold', fontsize=11, color=COLORS['navy_blue'])
 
     # 突出顯示主動比率 - BOA風格
     theta_p = ap_results['Active Ratio (θp)']
@@ -218,31 +468,25 @@ def create_theory_validation_table(ax, ap_results, passive_metrics, active_metri
     table.set_fontsize(10)
     table.scale(1, 2.2)
 
-    # BOA風格美化表格
-    for i in range(len(validations)):
-        for j in range(len(validations[0])):
-            cell = table[(i, j)]
-            if i == 0:  # 標題行 - 使用BOA深藍色
-                cell.set_facecolor(COLORS['navy_blue'])
-                cell.set_text_props(weight='bold', color='white')
-                cell.set_height(0.12)
-            else:
-                if j == 2:  # 結果列
-                    if 'PASS' in validations[i][j]:
-                        cell.set_facecolor('#D5EFDB')  # 淺綠
-                        cell.set_text_props(color='green', weight='bold')
-                    elif 'WARN' in validations[i][j]:
-                        cell.set_facecolor('#FFF2CC')  # 淺黃
-                        cell.set_text_props(color='orange', weight='bold')
-                    elif 'FAIL' in validations[i][j]:
-                        cell.set_facecolor('#FADBD8')  # 淺紅
-                        cell.set_text_props(color='red', weight='bold')
-                else:
-                    cell.set_facecolor(COLORS['light_gray'])
-                cell.set_height(0.08)
-            
-            cell.set_edgecolor(COLORS['deep_burgundy'])
-            cell.set_linewidth(1)
+    # BOA風格美化表格：先算好各格樣式，再單次走訪所有儲存格
+    n_rows, n_cols = len(validations), len(validations[0])
+    facecolors = np.full((n_rows, n_cols), COLORS['light_gray'], dtype=object)
+    text_colors = np.full((n_rows, n_cols), None, dtype=object)
+    heights = np.full(n_rows, 0.08)
+
+    facecolors[0, :] = COLORS['navy_blue']  # 標題行 - 使用BOA深藍色
+    text_colors[0, :] = 'white'
+    heights[0] = 0.12
+    for i, row in enumerate(validations[1:], start=1):  # 結果列
+        facecolors[i, 2], text_colors[i, 2] = VALIDATION_STYLES[row[2]]
+
+    for (i, j), cell in table.get_celld().items():
+        cell.set_facecolor(facecolors[i, j])
+        if text_colors[i, j] is not None:
+            cell.set_text_props(weight='bold', color=text_colors[i, j])
+        cell.set_height(heights[i])
+        cell.set_edgecolor(COLORS['deep_burgundy'])
+        cell.set_linewidth(1)
 
     ax.set_title('Lo (2007) 理論驗證結果\nTheory Validation Results', 
                 fontsize=13, fontweight='bold', pad=20)
@@ -255,23 +499,33 @@ def create_weight_return_analysis(ax, df_active):
                transform=ax.transAxes, ha='center', va='center', fontsize=12)
         return
 
-    weights = df_active['Weight'].dropna()
-    returns = df_active['Return'].dropna()
+    weights = df_active['Weight'].to_numpy(dtype=float)
+    returns = df_active['Return'].to_numpy(dtype=float)
+    weights = weights[~np.isnan(weights)]
+    returns = returns[~np.isnan(returns)]
     min_len = min(len(weights), len(returns))
-    weights = weights.iloc[-min_len:]
-    returns = returns.iloc[-min_len:] * 100  # 轉為百分比
+    weights = weights[len(weights) - min_len:]
+    returns = returns[len(returns) - min_len:] * 100  # 轉為百分比
 
-    # 散布圖
-    scatter = ax.scatter(weights, returns, alpha=0.6, s=25, c=returns, 
-                        cmap='RdYlBu_r', edgecolors='black', linewidth=0.5)
+    # 密度圖：以六角格統計觀察值，取代逐點繪製的散布圖
+    density = ax.hexbin(weights, returns, gridsize=60, cmap='RdYlBu_r', mincnt=1)
     
     # 趨勢線和統計
     if len(weights) > 10:
-        z = np.polyfit(weights, returns, 1)
-        p = np.poly1d(z)
-        ax.plot(weights, p(weights), "r-", alpha=0.8, linewidth=2.5)
-
-        correlation = np.corrcoef(weights, returns)[0, 1]
+        # 一元線性迴歸與相關係數皆由同一組離均差以封閉解求得
+        dx = weights - weights.mean()
+        dy = returns - returns.mean()
+        ss_x = np.dot(dx, dx)
+        ss_y = np.dot(dy, dy)
+        ss_xy = np.dot(dx, dy)
+
+        if ss_x > 0:
+            slope = ss_xy / ss_x
+            intercept = returns.mean() - slope * weights.mean()
+            x_ends = np.array([weights.min(), weights.max()])
+            ax.plot(x_ends, intercept + slope * x_ends, "r-", alpha=0.8, linewidth=2.5)
+
+        correlation = ss_xy / np.sqrt(ss_x * ss_y) if ss_x * ss_y > 0 else np.nan
         r_squared = correlation ** 2
         
         # 統計資訊框
@@ -288,31 +542,25 @@ def create_weight_return_analysis(ax, df_active):
     ax.grid(True, alpha=0.3)
     
     # 添加顏色條
-    plt.colorbar(scatter, ax=ax, label='報酬率 (%)', shrink=0.8)
+    ax.figure.colorbar(density, ax=ax, label='觀察次數 (Count)', shrink=0.8)
 
-def create_active_component_timeline(ax, df_passive, df_active):
+def create_active_component_timeline(ax, df_active, series):
     """累積主動貢獻時間序列"""
     
-    active = df_active['NAV'].pct_change().dropna()
-    passive = df_passive['NAV'].pct_change().dropna()
-    min_len = min(len(active), len(passive))
-    excess = (active.iloc[-min_len:] - passive.iloc[-min_len:]) * 100
-    cumulative_excess = excess.cumsum()
+    cumulative_excess = np.cumsum(series['excess'])
+    dates = df_active['Date'].to_numpy()[len(df_active) - len(cumulative_excess):]
 
-    # 主線圖
-    ax.plot(df_active['Date'].iloc[-min_len:], cumulative_excess,
-            color=COLORS['positive'], linewidth=3, alpha=0.9)
-    
-    # 填充區域
-    ax.fill_between(df_active['Date'].iloc[-min_len:], 0, cumulative_excess,
-                    alpha=0.3, color=COLORS['positive'],
-                    where=(cumulative_excess >= 0), interpolate=True)
-    ax.fill_between(df_active['Date'].iloc[-min_len:], 0, cumulative_excess,
-                    alpha=0.3, color=COLORS['negative'],
-                    where=(cumulative_excess < 0), interpolate=True)
+    with _deferred_autoscale(ax):
+        # 主線圖
+        _plot_downsampled(ax, dates, cumulative_excess,
+                          color=COLORS['positive'], linewidth=3, alpha=0.9)
+        
+        # 填充區域：正負區段一次切分，各以單一 PolyCollection 繪製
+        _fill_between_sign_runs(ax, mdates.date2num(dates), 0.0, cumulative_excess,
+                                alpha=0.3, interpolate=True)
 
     # 添加統計資訊
-    final_excess = cumulative_excess.iloc[-1]
+    final_excess = cumulative_excess[-1]
     max_excess = cumulative_excess.max()
     min_excess = cumulative_excess.min()
     
@@ -328,29 +576,21 @@ def create_active_component_timeline(ax, df_passive, df_active):
     ax.axhline(y=0, color='black', linestyle='--', alpha=0.7)
     ax.grid(True, alpha=0.3)
 
-def create_excess_return_distribution(ax, df_passive, df_active):
+def create_excess_return_distribution(ax, series):
     """超額報酬分佈直方圖與統計分析"""
     
-    active = df_active['NAV'].pct_change().dropna()
-    passive = df_passive['NAV'].pct_change().dropna()
-    min_len = min(len(active), len(passive))
-    excess = (active.iloc[-min_len:] - passive.iloc[-min_len:]) * 100
-    
-    # 超額報酬分佈直方圖
-    n, bins, patches = ax.hist(excess, bins=35, alpha=0.7, color=COLORS['primary_red'], 
-                              edgecolor='black', linewidth=0.5, density=True)
+    excess = series['excess']
+    moments = excess_return_moments(excess)
     
-    # 顏色漸變
-    for i, p in enumerate(patches):
-        if bins[i] < 0:
-            p.set_facecolor(COLORS['negative'])
-        else:
-            p.set_facecolor(COLORS['positive'])
-        p.set_alpha(0.7)
+    # 超額報酬分佈直方圖：負區間與正區間於建立時即分別著色
+    density, bins = np.histogram(excess, bins=35, density=True)
+    bar_colors = np.where(bins[:-1] < 0, COLORS['negative'], COLORS['positive'])
+    ax.bar(bins[:-1], density, width=np.diff(bins), align='edge', color=bar_colors,
+           alpha=0.7, edgecolor='black', linewidth=0.5)
 
     # 統計線
-    mean_excess = excess.mean()
-    std_excess = excess.std()
+    mean_excess = moments['mean']
+    std_excess = moments['std']
     
     ax.axvline(mean_excess, color='red', linestyle='--', linewidth=2.5, 
               label=f'平均值: {mean_excess:.3f}%')
@@ -358,14 +598,14 @@ def create_excess_return_distribution(ax, df_passive, df_active):
               label='零超額報酬')
     
     # 添加正態分佈曲線
-    x = np.linspace(excess.min(), excess.max(), 100)
+    x = np.linspace(bins[0], bins[-1], 100)  # 直方圖邊界即為樣本最小、最大值
     normal_curve = (1/(std_excess * np.sqrt(2 * np.pi))) * np.exp(-0.5 * ((x - mean_excess)/std_excess)**2)
     ax.plot(x, normal_curve, 'navy', linewidth=2, alpha=0.8, label='理論常態分佈')
 
     # 統計摘要
-    skewness = excess.skew()
-    kurtosis = excess.kurtosis()
-    win_rate = (excess > 0).mean()
+    skewness = moments['skewness']
+    kurtosis = moments['kurtosis']
+    win_rate = moments['win_rate']
     
     stats_text = f'''統計特徵:
 勝率: {win_rate:.1%}
@@ -385,24 +625,26 @@ def create_excess_return_distribution(ax, df_passive, df_active):
     ax.legend(loc='upper left')
     ax.grid(True, alpha=0.3)
 
-def create_rolling_performance(ax, df_passive, df_active):
+def create_rolling_performance(ax, df_passive, df_active, series):
     """30天滾動績效比較"""
     
-    passive_rolling = df_passive['NAV'].pct_change().rolling(30).mean() * 100
-    active_rolling = df_active['NAV'].pct_change().rolling(30).mean() * 100
+    passive_rolling = series['passive_rolling']
+    active_rolling = series['active_rolling']
+    active_dates = df_active['Date'].to_numpy()
 
-    ax.plot(df_passive['Date'], passive_rolling, label='被動策略', 
-           color=COLORS['passive'], linewidth=2, alpha=0.8)
-    ax.plot(df_active['Date'], active_rolling, label='主動策略', 
-           color=COLORS['primary_red'], linewidth=2, alpha=0.8)
-    
-    # 填充優勢區域
-    ax.fill_between(df_active['Date'], passive_rolling, active_rolling,
-                    where=(active_rolling >= passive_rolling),
-                    alpha=0.2, color=COLORS['positive'], interpolate=True)
-    ax.fill_between(df_active['Date'], passive_rolling, active_rolling,
-                    where=(active_rolling < passive_rolling),
-                    alpha=0.2, color=COLORS['negative'], interpolate=True)
+    with _deferred_autoscale(ax):
+        _plot_downsampled(ax, df_passive['Date'].to_numpy(), passive_rolling, label='被動策略', 
+                          color=COLORS['passive'], linewidth=2, alpha=0.8)
+        _plot_downsampled(ax, active_dates, active_rolling, label='主動策略', 
+                          color=COLORS['primary_red'], linewidth=2, alpha=0.8)
+        
+        # 填充優勢區域
+        ax.fill_between(active_dates, passive_rolling, active_rolling,
+                        where=(active_rolling >= passive_rolling),
+                        alpha=0.2, color=COLORS['positive'], interpolate=True)
+        ax.fill_between(active_dates, passive_rolling, active_rolling,
+                        where=(active_rolling < passive_rolling),
+                        alpha=0.2, color=COLORS['negative'], interpolate=True)
 
     ax.set_title('30天滾動報酬比較\n30-Day Rolling Return Comparison', 
                 fontsize=13, fontweight='bold', pad=15)
@@ -411,24 +653,34 @@ def create_rolling_performance(ax, df_passive, df_active):
     ax.grid(True, alpha=0.3)
     ax.axhline(y=0, color='black', linestyle='--', alpha=0.7)
 
-def create_rolling_ap_analysis(ax, df_active):
+def create_rolling_ap_analysis(ax, series):
     """滾動AP分解分析 - 增強統計指標"""
+    rolling = series['rolling_ap']
+    if rolling is None:
+        ax.text(0.5, 0.5, f"分析錯誤: {series['rolling_ap_error']}", transform=ax.transAxes, 
+               ha='center', va='center', fontsize=10)
+        ax.set_title('滾動AP分解分析', fontsize=13, fontweight='bold')
+        return
+
     try:
-        from src.ap_decomposition import rolling_ap_decomposition
-        rolling = rolling_ap_decomposition(df_active, window=60)
-        
         if not rolling.empty and len(rolling) > 0:
+            dates = rolling['Date'].to_numpy()
+            active_ratio = rolling['Active_Ratio'].to_numpy()
+
             # 主線圖
-            ax.plot(rolling['Date'], rolling['Active_Ratio'], 
+            ax.plot(dates, active_ratio, 
                    linewidth=2.5, color=COLORS['accent'], alpha=0.9, 
                    label='滾動主動比率')
-            ax.fill_between(rolling['Date'], 0, rolling['Active_Ratio'], 
+            ax.fill_between(dates, 0, active_ratio, 
                            alpha=0.3, color=COLORS['accent'])
             
             # 統計線
-            mean_ratio = rolling['Active_Ratio'].mean()
-            median_ratio = rolling['Active_Ratio'].median()
-            std_ratio = rolling['Active_Ratio'].std()
+            mean_ratio = active_ratio.mean()
+            median_ratio = np.median(active_ratio)
+            with warnings.catch_warnings():
+                # 僅一個窗口時樣本標準差無定義，記為 NaN 即可
+                warnings.simplefilter('ignore', category=RuntimeWarning)
+                std_ratio = active_ratio.std(ddof=1)
             
             ax.axhline(y=mean_ratio, color='red', linestyle=':', linewidth=2,
                       label=f'平均值: {mean_ratio:.3f}')
@@ -437,16 +689,15 @@ def create_rolling_ap_analysis(ax, df_active):
             
             # 統計指標計算
             # 穩定性與趨勢分析
-            positive_periods = (rolling['Active_Ratio'] > 0).mean()
-            volatility = rolling['Active_Ratio'].std()
-            trend = 'improving' if rolling['Active_Ratio'].iloc[-5:].mean() > rolling['Active_Ratio'].iloc[:5].mean() else 'declining'
+            positive_periods = (active_ratio > 0).mean()
+            trend = 'improving' if active_ratio[-5:].mean() > active_ratio[:5].mean() else 'declining'
             
             stats_text = f'''滾動AP統計摘要:
 平均主動比率: {mean_ratio:.4f}
 標準差: {std_ratio:.4f}
 正值比例: {positive_periods:.1%}
 近期趨勢: {trend}
-觀察窗口: 60天'''
+觀察窗口: {ROLLING_AP_WINDOW}天'''
             
             ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, 
                    fontsize=9, verticalalignment='top',
@@ -454,7 +705,7 @@ def create_rolling_ap_analysis(ax, df_active):
                             facecolor=COLORS['light_gray'], 
                             alpha=0.95, edgecolor=COLORS['deep_burgundy']))
             
-            ax.set_title('滾動AP分解分析 (60天窗口)\nRolling AP Decomposition Analysis', 
+            ax.set_title(f'滾動AP分解分析 ({ROLLING_AP_WINDOW}天窗口)\nRolling AP Decomposition Analysis', 
                         fontsize=13, fontweight='bold', pad=15)
             ax.set_ylabel('主動比率 (θp)', fontsize=11)
             ax.axhline(y=0, color='black', linestyle='--', alpha=0.7)
@@ -507,41 +758,29 @@ def create_performance_metrics_table(ax, passive_metrics, active_metrics):
     table.set_fontsize(9)
     table.scale(1.2, 1.5)
     
-    # 表格美化與績效著色
-    for i in range(len(table_data) + 1):
-        for j in range(3):
-            cell = table[(i, j)]
-            if i == 0:  # 表頭
-                cell.set_facecolor(COLORS['navy_blue'])
-                cell.set_text_props(weight='bold', color='white')
-                cell.set_height(0.15)
+    # 主動策略績效著色：綠色表示優勢、紅色表示劣勢
+    active_colors = []
+    for _, key, _ in metrics_info:
+        try:
+            if key in LOWER_IS_BETTER_METRICS:
+                better = abs(active_metrics[key]) < abs(passive_metrics[key])
             else:
-                # 主動策略績效著色
-                if j == 2:
-                    try:
-                        metric_key = metrics_info[i-1][1]
-                        if metric_key in ['total_return', 'annualized_return', 'sharpe_ratio', 
-                                        'win_rate', 'calmar_ratio', 'sortino_ratio']:
-                            # 數值越大越好的指標
-                            if active_metrics[metric_key] > passive_metrics[metric_key]:
-                                cell.set_facecolor('#D5F5E3')  # 綠色表示優勢
-                            else:
-                                cell.set_facecolor('#FADBD8')  # 紅色表示劣勢
-                        elif metric_key in ['annualized_volatility', 'max_drawdown']:
-                            # 數值越小越好的指標
-                            if abs(active_metrics[metric_key]) < abs(passive_metrics[metric_key]):
-                                cell.set_facecolor('#D5F5E3')  # 綠色表示優勢
-                            else:
-                                cell.set_facecolor('#FADBD8')  # 紅色表示劣勢
-                    except:
-                        cell.set_facecolor('#F8F9FA')
-                else:
-                    cell.set_facecolor('#F8F9FA')
-                
-                cell.set_height(0.1)
-            
-            cell.set_edgecolor(COLORS['deep_burgundy'])
-            cell.set_linewidth(1)
+                better = active_metrics[key] > passive_metrics[key]
+            active_colors.append('#D5F5E3' if better else '#FADBD8')
+        except (KeyError, TypeError):
+            active_colors.append('#F8F9FA')
+
+    # 表格美化：單次走訪所有儲存格
+    for (i, j), cell in table.get_celld().items():
+        if i == 0:  # 表頭
+            cell.set_facecolor(COLORS['navy_blue'])
+            cell.set_text_props(weight='bold', color='white')
+            cell.set_height(0.15)
+        else:
+            cell.set_facecolor(active_colors[i - 1] if j == 2 else '#F8F9FA')
+            cell.set_height(0.1)
+        cell.set_edgecolor(COLORS['deep_burgundy'])
+        cell.set_linewidth(1)
 
     ax.set_title('策略績效比較表\nPerformance Metrics Comparison', 
                 fontsize=13, fontweight='bold', pad=20)